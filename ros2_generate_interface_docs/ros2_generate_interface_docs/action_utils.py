@@ -12,15 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import pathlib
-
-from ament_index_python.packages import get_package_share_directory
-
 from ros2_generate_interface_docs import utils
 
 from rosidl_parser.definition import Action
-from rosidl_parser.definition import IdlLocator
-from rosidl_parser.parser import parse_idl_file
 
 
 def generate_msg_text_from_spec(package, interface_name, indent=0):
@@ -41,16 +35,12 @@ def generate_msg_text_from_spec(package, interface_name, indent=0):
     :returns: dictionary with the compact definition (constanst and message with links)
     :rtype: dict
     """
-    interface_location = IdlLocator(
-        pathlib.Path(get_package_share_directory(package)),
-        pathlib.Path('action') / (interface_name + '.idl')
-    )
-    message = parse_idl_file(interface_location).content.get_elements_of_type(Action)
+    message = utils.parse_interface_idl(package, 'action', interface_name, Action)
 
     compact_srv = {}
 
     for attribute in ['goal', 'result', 'feedback']:
-        definition = utils.generate_compact_definition(getattr(message[0], attribute), indent)
-        utils.copy_dict_with_suffix(compact_srv, definition, attribute)
+        utils.generate_compact_definition(
+            getattr(message[0], attribute), indent, attribute, compact_srv)
 
     return compact_srv
@@ -15,6 +15,7 @@
 # limitations under the License.
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 import os
 import sys
 import time
@@ -28,6 +29,51 @@ from rosidl_runtime_py import get_action_interfaces
 from rosidl_runtime_py import get_message_interfaces
 from rosidl_runtime_py import get_service_interfaces
 
+# Template, file extension, type name and compact definition generator of each interface type
+_INTERFACE_TYPES = {
+    'msg': ('msg.html.em', 'msg', 'Message', msg_utils.generate_msg_text_from_spec),
+    'srv': ('srv.html.em', 'msg', 'Service', srv_utils.generate_msg_text_from_spec),
+    'action': ('action.html.em', 'action', 'Action', action_utils.generate_msg_text_from_spec),
+}
+
+
+def positive_int(value):
+    """
+    Convert a command line argument to a positive integer.
+
+    :param value: command line argument
+    :type value: str
+    :returns: the argument as an integer
+    :rtype: int
+    :raises argparse.ArgumentTypeError: if the argument is not an integer greater than 0
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'{value!r} is not a positive integer')
+    return number
+
+
+def create_output_directories(messages, services, actions, html_dir):
+    """
+    Create all the output directories in a single pass.
+
+    :param messages: Message package name as a key and a list of message names as value
+    :type messages: dict
+    :param services: Service package name as a key and a list of service names as value
+    :type services: dict
+    :param actions: Action package name as a key and a list of action names as value
+    :type actions: dict
+    :param html_dir: path to the directory where the documentation is generated
+    :type html_dir: str
+    """
+    # Package directories are created as parents of their interface type directories
+    for interface_type, interfaces in (('msg', messages), ('srv', services), ('action', actions)):
+        for package_name in interfaces:
+            os.makedirs(os.path.join(html_dir, package_name, interface_type), exist_ok=True)
+
 
 def generate_interfaces_index(messages, services, actions, html_dir, timestamp):
     """
@@ -41,75 +87,113 @@ def generate_interfaces_index(messages, services, actions, html_dir, timestamp):
     :param type: dict
     :param html_dir: path to the directory to save the index
     :type html_dir: str
-    :param timestamp: timestamp to include in the index site
-    :param timestamp: time.struct_time
+    :param timestamp: formatted timestamp to include in the index site
+    :type timestamp: str
     """
-    interface_packages = messages.keys() | services.keys() | actions.keys()
+    interface_packages = set().union(messages, services, actions)
 
     for package_name in interface_packages:
-        msg_list = []
-        srv_list = []
-        action_list = []
-        if package_name in messages.keys():
-            msg_list = messages[package_name]
-        if package_name in services.keys():
-            srv_list = services[package_name]
-        if package_name in actions.keys():
-            action_list = actions[package_name]
         package_directory = os.path.join(html_dir, package_name)
-        os.makedirs(package_directory, exist_ok=True)
         utils.generate_index(
-            package_name, package_directory, timestamp, msg_list, srv_list, action_list)
+            package_name, package_directory, timestamp,
+            messages.get(package_name, ()),
+            services.get(package_name, ()),
+            actions.get(package_name, ()))
 
 
-def generate_interfaces(interfaces, html_dir, template, interface_type, timestamp):
+def generate_package_interfaces(package_name, package_interfaces, html_dir, timestamp,
+                                cache_dir=None, force=False):
     """
-    Generate the index and documentation for each message.
+    Generate the documentation for all the interfaces of a single package.
+
+    This function runs in a worker process, so all its arguments must be picklable.
 
-    :param interfaces: dictionary with the interface package name associated with all
-        the interfaces for this package.
-    :type interfaces: dict of {str : str[]}
+    :param package_name: name of the package
+    :type package_name: str
+    :param package_interfaces: interface type (msg, srv or action) as a key and a list of
+        interface names of this type as value
+    :type package_interfaces: dict of {str : str[]}
     :param html_dir: path to the directory to save the generated documentation
     :type html_dir: str
-    :param template_dir: template name
-    :type template_dir: str
-    :param interface_type: type of the interface: msg, action or srv
-    :type interface_type: str
-    :param timestamp: timestamp to include in the index site
-    :param timestamp: time.struct_time
+    :param timestamp: formatted timestamp to include in the generated documentation
+    :type timestamp: str
+    :param cache_dir: directory of the documentation cache, None to disable it
+    :type cache_dir: str, optional
+    :param force: generate the documentation even if it is up to date
+    :type force: bool, optional
     """
-    for package_name, interface_names in interfaces.items():
-        package_directory = os.path.join(html_dir, package_name)
-        interface_type_directory = os.path.join(package_directory, interface_type)
-        os.makedirs(interface_type_directory, exist_ok=True)
-        for interface_name in interface_names:
-            documentation_data = {
-                'interface_name': interface_name,
+    package_directory = os.path.join(html_dir, package_name)
+    try:
+        for interface_type, interface_names in package_interfaces.items():
+            template, ext, type_name, generate_text_from_spec = _INTERFACE_TYPES[interface_type]
+
+            # The data shared by every interface of this type is built once and copied per
+            # interface, each copy is consumed by the evaluation of the template
+            base_documentation_data = {
+                'ext': ext,
+                'type': type_name,
                 'interface_package': package_name,
                 'timestamp': timestamp
             }
 
-            if interface_type == 'msg':
-                documentation_data['ext'] = 'msg'
-                documentation_data['type'] = 'Message'
-                function_to_generate_text_from_spec = msg_utils.generate_msg_text_from_spec
+            for interface_name in interface_names:
+                documentation_data = base_documentation_data.copy()
+                documentation_data['interface_name'] = interface_name
 
-            if interface_type == 'srv':
-                documentation_data['ext'] = 'msg'
-                documentation_data['type'] = 'Service'
-                function_to_generate_text_from_spec = srv_utils.generate_msg_text_from_spec
+                utils.generate_interface_documentation(
+                    '%s/%s' % (package_name, interface_name),
+                    template,
+                    os.path.join(package_directory, interface_name + '.html'),
+                    documentation_data,
+                    generate_text_from_spec,
+                    cache_dir,
+                    force)
+    finally:
+        # Shut down explicitly, worker processes exit without running atexit handlers
+        utils.shutdown_template_interpreter()
 
-            if interface_type == 'action':
-                documentation_data['ext'] = 'action'
-                documentation_data['type'] = 'Action'
-                function_to_generate_text_from_spec = action_utils.generate_msg_text_from_spec
 
-            utils.generate_interface_documentation(
-                '%s/%s' % (package_name, interface_name),
-                template,
-                os.path.join(package_directory, interface_name + '.html'),
-                documentation_data,
-                function_to_generate_text_from_spec)
+def generate_interfaces(messages, services, actions, html_dir, timestamp, executor,
+                        cache_dir=None, force=False):
+    """
+    Generate the documentation for each message, service and action.
+
+    Each package is submitted as a single task to the executor, which documents all its
+    interfaces.
+
+    :param messages: Message package name as a key and a list of message names as value
+    :type messages: dict
+    :param services: Service package name as a key and a list of service names as value
+    :type services: dict
+    :param actions: Action package name as a key and a list of action names as value
+    :type actions: dict
+    :param html_dir: path to the directory to save the generated documentation
+    :type html_dir: str
+    :param timestamp: formatted timestamp to include in the generated documentation
+    :type timestamp: str
+    :param executor: executor running the generation of each package
+    :type executor: concurrent.futures.Executor
+    :param cache_dir: directory of the documentation cache, None to disable it
+    :type cache_dir: str, optional
+    :param force: generate the documentation even if it is up to date
+    :type force: bool, optional
+    """
+    interface_packages = set().union(messages, services, actions)
+
+    futures = []
+    for package_name in interface_packages:
+        package_interfaces = {}
+        for interface_type, interfaces in (
+                ('msg', messages), ('srv', services), ('action', actions)):
+            if package_name in interfaces:
+                package_interfaces[interface_type] = interfaces[package_name]
+        futures.append(executor.submit(
+            generate_package_interfaces, package_name, package_interfaces, html_dir, timestamp,
+            cache_dir, force))
+
+    # Wait for every package and propagate the errors raised in the workers
+    for future in futures:
+        future.result()
 
 
 def main(argv=sys.argv[1:]):
@@ -125,6 +209,16 @@ def main(argv=sys.argv[1:]):
         default=[],
         nargs='*',
         help='Generate the documentation for the following package names')
+    parser.add_argument(
+        '--jobs', type=positive_int, default=os.cpu_count(),
+        help='Number of processes used to generate the documentation')
+    parser.add_argument(
+        '--cache-dir', type=str, default=os.environ.get('ROS2_DOCS_CACHE_DIR'),
+        help='Directory where the generated documentation is cached across runs, '
+             'the ROS2_DOCS_CACHE_DIR environment variable is used by default')
+    parser.add_argument(
+        '--force', action='store_true',
+        help='Generate the documentation of the interfaces even if it is up to date')
     args = parser.parse_args(argv)
 
     html_dir = os.path.join(args.outputdir, 'html')
@@ -141,14 +235,33 @@ def main(argv=sys.argv[1:]):
         )
         exit(-1)
 
-    timestamp = time.gmtime()
+    # Format the timestamp once, every generated page shares the same one.
+    # SOURCE_DATE_EPOCH is honored so the generated documentation is reproducible
+    source_date_epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    try:
+        build_time = time.gmtime(
+            time.time() if source_date_epoch is None else int(source_date_epoch))
+    except (ValueError, OverflowError, OSError) as e:
+        print(
+            f'SOURCE_DATE_EPOCH {source_date_epoch!r} is not a valid number of seconds since '
+            f'the epoch. Reason: {e}',
+            file=sys.stderr
+        )
+        exit(-1)
+    timestamp = time.strftime('%b %d %Y %H:%M:%S', build_time)
 
+    create_output_directories(messages, services, actions, html_dir)
+    if args.cache_dir:
+        os.makedirs(args.cache_dir, exist_ok=True)
     generate_interfaces_index(messages, services, actions, html_dir, timestamp)
+    # Shut down before the worker processes are forked, so they do not inherit the interpreter
+    utils.shutdown_template_interpreter()
 
-    # generate msg interfaces
-    generate_interfaces(messages, html_dir, 'msg.html.em', 'msg', timestamp)
-    generate_interfaces(services, html_dir, 'srv.html.em', 'srv', timestamp)
-    generate_interfaces(actions, html_dir, 'action.html.em', 'action', timestamp)
+    # generate msg, srv and action interfaces
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        generate_interfaces(
+            messages, services, actions, html_dir, timestamp, executor, args.cache_dir,
+            args.force)
 
     utils.copy_css_style(html_dir)
 
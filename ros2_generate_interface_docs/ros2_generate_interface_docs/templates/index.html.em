@@ -1,6 +1,3 @@
-@{
-import time
-}@
 <!DOCTYPE html>
 <html lang="en">
   <head>
@@ -34,7 +31,7 @@ import time
 @[  end for]@
       </ul>
 @[end if]@
-      <p class="footer">autogenerated on @(time.strftime("%b %d %Y %H:%M:%S", timestamp))</p>
+      <p class="footer">autogenerated on @(timestamp)</p>
     </div>
   </body>
 </html>
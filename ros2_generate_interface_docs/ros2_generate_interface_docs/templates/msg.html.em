@@ -1,7 +1,3 @@
-@{
-import html
-import time
-}@
 <!DOCTYPE html>
 <html lang="en">
   <head>
@@ -16,15 +12,7 @@ import time
         <h2>File: <span class="filename">@(interface_package)/@(interface_name).@(ext)</span></h2>
         <h2>Raw Message Definition</h2>
         <div class="raw-msg">
-@[for line in raw_text.splitlines()]@
-@{  text = line.strip('#')}@
-@[  if '#' in line]@
-          <div class="comment-text">#@(html.escape(text))</div><br>
-@[  else]@
-          @(html.escape(text))<br>
-@[  end if]@
-@[end for]@
-        </div>
+@(raw_text)        </div>
         <h2>Compact Message Definition</h2>
         <div class="compact_definition-msg">
 @[for constant_name, constant_type in zip(constant_names, constant_types)]@
@@ -39,7 +27,7 @@ import time
 @[end for]@
         </div>
       </div>
-      <p class="footer">autogenerated on @(time.strftime("%b %d %Y %H:%M:%S", timestamp))</p>
+      <p class="footer">autogenerated on @(timestamp)</p>
     </div>
   </body>
 </html>
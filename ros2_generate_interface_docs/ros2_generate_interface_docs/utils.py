@@ -12,23 +12,32 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import errno
+import functools
+import hashlib
+import html
 from io import StringIO
 import os
+import pathlib
 import shutil
 import sys
 
+from ament_index_python.packages import get_package_share_directory
+
 import em
 
 from rosidl_parser.definition import (
     AbstractGenericString, AbstractString, Array, BasicType, BoundedSequence,
-    BoundedString, NamespacedType, UnboundedSequence
+    BoundedString, IdlLocator, NamespacedType, UnboundedSequence
 )
+from rosidl_parser.parser import parse_idl_file
 
 from rosidl_runtime_py import get_interface_path
 
 _TEMPLATES_DIR = 'templates'
 
+# Every interface of a package resolves the same share directory through the ament index
+_get_package_share_directory = functools.lru_cache(maxsize=None)(get_package_share_directory)
+
 
 def resource_name(resource):
     """
@@ -42,12 +51,53 @@ def resource_name(resource):
     """
     if '/' not in resource:
         return '', '', resource
-    values = resource.split('/')
-    if len(values) != 3:
-        raise ValueError('Resource name "{}" is malformed'.format(resource))
-    return tuple(values)
+    try:
+        package, interface_type, interface_name = resource.split('/')
+    except ValueError:
+        raise ValueError('Resource name "{}" is malformed'.format(resource)) from None
+    return package, interface_type, interface_name
 
 
+def get_interface_idl_path(package, interface_type, interface_name):
+    """
+    Return the path to the IDL file of an interface.
+
+    :param package: name of the package
+    :type package: str
+    :param interface_type: type of the interface: msg, srv or action
+    :type interface_type: str
+    :param interface_name: name of the interface
+    :type interface_name: str
+    :returns: path to the IDL file in the share directory of the package
+    :rtype: str
+    """
+    return os.path.join(
+        _get_package_share_directory(package), interface_type, interface_name + '.idl')
+
+
+def parse_interface_idl(package, interface_type, interface_name, element_type):
+    """
+    Parse the IDL file of an interface.
+
+    :param package: name of the package
+    :type package: str
+    :param interface_type: type of the interface: msg, srv or action
+    :type interface_type: str
+    :param interface_name: name of the interface
+    :type interface_name: str
+    :param element_type: rosidl_parser.definition class of the elements to return
+    :type element_type: type
+    :returns: the elements of the given type defined in the IDL file
+    :rtype: list
+    """
+    package_share_directory = pathlib.Path(_get_package_share_directory(package))
+    idl_path = pathlib.Path(get_interface_idl_path(package, interface_type, interface_name))
+    interface_location = IdlLocator(
+        package_share_directory, idl_path.relative_to(package_share_directory))
+    return parse_idl_file(interface_location).content.get_elements_of_type(element_type)
+
+
+@functools.lru_cache(maxsize=None)
 def get_templates_dir():
     """
     Return template directory.
@@ -66,9 +116,11 @@ def copy_css_style(folder_name):
     :type folder_name: str
     """
     for style in ['styles.css', 'msg-styles.css']:
-        shutil.copy(os.path.join(get_templates_dir(), style), os.path.join(folder_name, style))
+        shutil.copyfile(
+            os.path.join(get_templates_dir(), style), os.path.join(folder_name, style))
 
 
+@functools.lru_cache(maxsize=None)
 def load_template(input_filename):
     """
     Look up file within rosdoc ROS package.
@@ -83,9 +135,7 @@ def load_template(input_filename):
     :rtype: tuple
     """
     filename = os.path.join(get_templates_dir(), input_filename)
-    if not os.path.isfile(filename):
-        raise FileNotFoundError(
-            errno.ENOENT, os.strerror(errno.ENOENT), filename)
+    # open raises FileNotFoundError itself when the template does not exist
     with open(filename, 'r') as f:
         content = f.read()
         if not content:
@@ -93,12 +143,137 @@ def load_template(input_filename):
         return content, filename
 
 
+@functools.lru_cache(maxsize=None)
+def get_template_mtime_ns(input_filename):
+    """
+    Return the modification time of a template.
+
+    :param input_filename: name of the template
+    :type input_filename: str
+    :returns: modification time of the template in nanoseconds
+    :rtype: int
+    """
+    return os.stat(os.path.join(get_templates_dir(), input_filename)).st_mtime_ns
+
+
+@functools.lru_cache(maxsize=None)
+def get_generator_source_paths():
+    """
+    Return the paths to the code of this package.
+
+    The generated documentation depends on this code as much as on the templates.
+
+    :returns: sorted paths to the Python modules of this package
+    :rtype: tuple
+    """
+    package_directory = os.path.dirname(__file__)
+    return tuple(sorted(
+        os.path.join(package_directory, filename)
+        for filename in os.listdir(package_directory) if filename.endswith('.py')))
+
+
+@functools.lru_cache(maxsize=None)
+def get_generator_mtime_ns():
+    """
+    Return the modification time of the code of this package.
+
+    Pages older than the code are generated again.
+
+    :returns: latest modification time of the Python modules of this package in nanoseconds
+    :rtype: int
+    """
+    return max(os.stat(path).st_mtime_ns for path in get_generator_source_paths())
+
+
+@functools.lru_cache(maxsize=None)
+def get_generator_digest():
+    """
+    Return a hash of the code of this package.
+
+    Cache entries generated by a different version of the code are not reused.
+
+    :returns: SHA-256 digest of the Python modules of this package
+    :rtype: bytes
+    """
+    generator_digest = hashlib.sha256()
+    for path in get_generator_source_paths():
+        with open(path, 'rb') as h:
+            generator_digest.update(os.path.basename(path).encode('utf-8'))
+            generator_digest.update(b'\0')
+            generator_digest.update(h.read())
+            generator_digest.update(b'\0')
+    return generator_digest.digest()
+
+
+def is_documentation_up_to_date(file_output_path, interface_template, source_paths):
+    """
+    Check if the documentation of an interface is newer than everything it is generated from.
+
+    :param file_output_path: path to the generated documentation
+    :type file_output_path: str
+    :param interface_template: name of the template
+    :type interface_template: str
+    :param source_paths: paths to the files the documentation is generated from
+    :type source_paths: list
+    :returns: True if the documentation exists and no source, template or code of this
+        package is newer
+    :rtype: bool
+    """
+    try:
+        output_mtime_ns = os.stat(file_output_path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    source_mtime_ns = max(
+        get_template_mtime_ns(interface_template),
+        get_generator_mtime_ns(),
+        *(os.stat(path).st_mtime_ns for path in source_paths))
+    return output_mtime_ns >= source_mtime_ns
+
+
+def get_documentation_cache_key(interface_template, spec, idl_path, documentation_data):
+    """
+    Compute the key of the documentation of an interface in the documentation cache.
+
+    The key is a hash of everything the generated documentation depends on except the
+    timestamp, including the code of this package, so unchanged interfaces are reused across
+    runs of the same version of this package.
+
+    :param interface_template: name of the template
+    :type interface_template: str
+    :param spec: raw definition of the interface
+    :type spec: str
+    :param idl_path: path to the IDL file used to generate the compact definition
+    :type idl_path: str
+    :param documentation_data: dictionary with the data to fill the template
+    :type documentation_data: dict
+    :returns: hexadecimal SHA-256 digest
+    :rtype: str
+    """
+    template_content, _ = load_template(interface_template)
+    with open(idl_path, 'rb') as h:
+        idl_content = h.read()
+    data = sorted(
+        (key, value) for key, value in documentation_data.items() if key != 'timestamp')
+
+    cache_key = hashlib.sha256()
+    for part in (get_generator_digest(), template_content.encode('utf-8'),
+                 spec.encode('utf-8'), idl_content, repr(data).encode('utf-8')):
+        cache_key.update(part)
+        cache_key.update(b'\0')
+    return cache_key.hexdigest()
+
+
 def generate_interface_documentation(interface, interface_template, file_output_path,
-                                     documentation_data, generate_text_from_spec):
+                                     documentation_data, generate_text_from_spec,
+                                     cache_dir=None, force=False):
     """
     Generate documentation for a single ROSIDL interface.
 
     This function write in a file the message static HTML site.
+    Unless forced, the documentation is not generated again when it is newer than the
+    interface definition, its IDL file, the template and the code of this package.
+    If a cache directory is given, the documentation is copied from it when an entry for
+    the same inputs exists and the generation is not forced, and stored in it otherwise.
 
     :param interface: name of the interface
     :type interface: str
@@ -107,26 +282,71 @@ def generate_interface_documentation(interface, interface_template, file_output_
     :param file_output_path: name of the file where the template will be written
         once filled
     :type file_output_path: str
-    :param documentation_data: dictionary with the data to field the index template
+    :param documentation_data: dictionary with the data to field the index template, it is
+        updated with the raw and compact definitions of the interface and used as the locals
+        of the template, so it must not be reused afterwards
     :type documentation_data: dict
     :param generate_text_from_spec: function with the logic to fill the compact
         definition for a specific type of interface
     :type generate_text_from_spec: function
+    :param cache_dir: existing directory of the documentation cache, None to disable it
+    :type cache_dir: str, optional
+    :param force: generate the documentation even if it is up to date or cached
+    :type force: bool, optional
     """
     package, interface_type, base_type = resource_name(interface)
     file_path = get_interface_path(interface)
-    with open(file_path, 'r', encoding='utf-8') as h:
-        spec = h.read().rstrip()
-
-    compact_definition = generate_text_from_spec(package, base_type, spec)
-    documentation_data['raw_text'] = spec
-    content = evaluate_template(
-        interface_template,
-        {**documentation_data, **compact_definition})
+    idl_path = get_interface_idl_path(package, interface_type, base_type)
+    if not force and is_documentation_up_to_date(
+            file_output_path, interface_template, [file_path, idl_path]):
+        return
+
+    # Decoded in one call, generate_raw_text splits any kind of line ending
+    with open(file_path, 'rb') as h:
+        spec = h.read().decode('utf-8').rstrip()
+
+    if cache_dir:
+        cache_key = get_documentation_cache_key(
+            interface_template, spec, idl_path, documentation_data)
+        cache_path = os.path.join(cache_dir, cache_key + '.html')
+        # A forced run renders the page again and refreshes the cache entry
+        if not force and os.path.isfile(cache_path):
+            replace_file(file_output_path, functools.partial(shutil.copyfile, cache_path))
+            return
+
+    compact_definition = generate_text_from_spec(package, base_type)
+    documentation_data['raw_text'] = generate_raw_text(spec)
+    documentation_data.update(compact_definition)
+    content = evaluate_template(interface_template, documentation_data)
     write_template(content, file_output_path)
 
+    if cache_dir:
+        write_template(content, cache_path)
 
-def generate_index(package, file_directory, timestamp, msg_list=[], srv_list=[], action_list=[]):
+
+def generate_raw_text(spec):
+    """
+    Generate the HTML of the raw definition of an interface.
+
+    Comment lines are wrapped in a comment-text block, every line is escaped and followed
+    by a line break.
+
+    :param spec: raw definition of the interface
+    :type spec: str
+    :returns: HTML of the raw definition
+    :rtype: str
+    """
+    raw_text = []
+    for line in spec.splitlines():
+        text = html.escape(line.strip('#'))
+        if '#' in line:
+            raw_text.append(f'          <div class="comment-text">#{text}</div><br>\n')
+        else:
+            raw_text.append(f'          {text}<br>\n')
+    return ''.join(raw_text)
+
+
+def generate_index(package, file_directory, timestamp, msg_list=(), srv_list=(), action_list=()):
     """
     Generate the message index page.
 
@@ -136,27 +356,29 @@ def generate_index(package, file_directory, timestamp, msg_list=[], srv_list=[],
     :type file_directory: str
     :param msg_list: name of messages for the specific package name
     :type msg_list: list
-    :param msg_list: name of services package name
-    :type msg_list: list
-    :param msg_list: name of actions for the specific package name
-    :type msg_list: list
-    :param timestamp: time to be included in all the generated files
-    :type timestamp: time
+    :param srv_list: name of services for the specific package name
+    :type srv_list: list
+    :param action_list: name of actions for the specific package name
+    :type action_list: list
+    :param timestamp: formatted time to be included in all the generated files
+    :type timestamp: str
     """
     package_index_data = {}
     package_index_data['package'] = package
     package_index_data['timestamp'] = timestamp
 
+    package_prefix = package + '/'
+
     package_index_data['msg_relative_paths'] = [
-        package + '/' + msg + '.html' for msg in msg_list]
+        f'{package_prefix}{msg}.html' for msg in msg_list]
     package_index_data['msg_list'] = msg_list
 
     package_index_data['srv_relative_paths'] = [
-        package + '/' + srv + '.html' for srv in srv_list]
+        f'{package_prefix}{srv}.html' for srv in srv_list]
     package_index_data['srv_list'] = srv_list
 
     package_index_data['action_relative_paths'] = [
-        package + '/' + action + '.html' for action in action_list]
+        f'{package_prefix}{action}.html' for action in action_list]
     package_index_data['action_list'] = action_list
 
     file_output_path = os.path.join(file_directory, 'index-msg.html')
@@ -164,32 +386,83 @@ def generate_index(package, file_directory, timestamp, msg_list=[], srv_list=[],
     write_template(content, file_output_path)
 
 
+def replace_file(output_file, write_temporary_file):
+    """
+    Create or replace a file through a temporary file.
+
+    The temporary file replaces the output file once complete, so an interrupted run or a
+    concurrent reader never sees a partially written file.
+
+    :param output_file: path of the file to create or replace
+    :type output_file: str
+    :param write_temporary_file: function writing the content of the file to the path it is
+        given
+    :type write_temporary_file: function
+    """
+    temporary_file = '%s.%d.tmp' % (output_file, os.getpid())
+    try:
+        write_temporary_file(temporary_file)
+        os.replace(temporary_file, output_file)
+    except BaseException:
+        # Do not leave a partial temporary file in the output or cache directory
+        try:
+            os.unlink(temporary_file)
+        except FileNotFoundError:
+            pass
+        raise
+
+
 def write_template(content, output_file):
     """
     Write the data in the template.
 
+    The output file is replaced atomically with replace_file.
+
     :param content: data to write in the file
     :type content: str
     :param output_file: path where the file will be written
     :type output_file: str
     """
-    with open(os.path.join(output_file), 'w') as f:
-        f.write(content)
+    def write_content(temporary_file):
+        # Encoded in one call, skipping the text layer
+        with open(temporary_file, 'wb') as f:
+            f.write(content.encode('utf-8'))
 
+    replace_file(output_file, write_content)
 
-def copy_dict_with_suffix(destination, source, suffix):
+
+@functools.lru_cache(maxsize=None)
+def get_template_interpreter():
     """
-    Copy a dictionary and add a suffix to each key.
+    Return the EmPy interpreter shared by every template evaluated in this process.
+
+    The interpreter is created on first use and lives until shutdown_template_interpreter is
+    called.
 
-    :param destination: dictionary to set the value with the new key
-    :type destination: dict
-    :param source: dictionary to copy
-    :type source: dict
-    :param suffix:
-    :type suffix: str
+    :returns: the interpreter and the buffer it writes to
+    :rtype: tuple
     """
-    for key, value in source.items():
-        destination['{}_{}'.format(key, suffix)] = value
+    output = StringIO()
+    interpreter = em.Interpreter(
+        output=output,
+        options={
+            em.BUFFERED_OPT: True,
+            em.RAW_OPT: True,
+        },
+    )
+    return interpreter, output
+
+
+def shutdown_template_interpreter():
+    """
+    Shut down the EmPy interpreter of this process, if it was created.
+
+    A later evaluation creates a new interpreter.
+    """
+    if get_template_interpreter.cache_info().currsize:
+        interpreter, _ = get_template_interpreter()
+        get_template_interpreter.cache_clear()
+        interpreter.shutdown()
 
 
 def evaluate_template(template_name, data):
@@ -198,36 +471,45 @@ def evaluate_template(template_name, data):
 
     :param template_dir: name of the template to write
     :type template_dir: str
-    :param data: data that is used to fill the template
+    :param data: data that is used to fill the template, it is used as the locals of the
+        template, which may assign variables in it, so it must not be reused afterwards
     :type template_dir: dict
     :returns: string with the template evaluated
     :rtype: str
     """
     msg_index_template, template_path = load_template(template_name)
-    output = StringIO()
-    interpreter = em.Interpreter(
-        output=output,
-        options={
-            em.BUFFERED_OPT: True,
-            em.RAW_OPT: True,
-        },
-    )
+    interpreter, output = get_template_interpreter()
+    # Discard the output of the previous evaluation, even if it failed
+    output.seek(0)
+    output.truncate(0)
     try:
-        with open(template_path, 'r') as h:
-            template_content = h.read()
-            interpreter.invoke(
-                'beforeFile', name=template_name, file=h, locals=data)
-        interpreter.string(template_content, template_path, locals=data)
+        # The template content is cached, so it is not read from the file again
+        interpreter.invoke(
+            'beforeFile', name=template_name, file=StringIO(msg_index_template), locals=data)
+        interpreter.string(msg_index_template, template_path, locals=data)
         interpreter.invoke('afterFile')
     except Exception as e:  # noqa: F841
         print(f"{e.__class__.__name__} when expanding '{template_name}' "
               f": '{e}'", file=sys.stderr)
         raise
 
-    content = output.getvalue()
-    interpreter.shutdown()
+    return output.getvalue()
+
+
+@functools.lru_cache(maxsize=None)
+def get_namespaced_type_and_link(namespaced_name):
+    """
+    Get the type and link of a namespaced type.
 
-    return content
+    The same types are referenced by many fields, so they are built once per type.
+
+    :param namespaced_name: namespaces and name of the type
+    :type namespaced_name: tuple
+    :returns: a string with the type and the relative link to its documentation
+    :rtype: str, str
+    """
+    type_field = '/'.join(namespaced_name)
+    return type_field, type_field + '.html'
 
 
 def get_field_type_and_link(field):
@@ -240,17 +522,17 @@ def get_field_type_and_link(field):
     :rtype: str, str
     """
     link = ''
-    if isinstance(field.type.value_type, AbstractGenericString):
+    value_type = field.type.value_type
+    if isinstance(value_type, AbstractGenericString):
         type_field = 'string'
-    elif isinstance(field.type.value_type, NamespacedType):
-        type_field = '/'.join(field.type.value_type.namespaced_name())
-        link = type_field + '.html'
+    elif isinstance(value_type, NamespacedType):
+        type_field, link = get_namespaced_type_and_link(value_type.namespaced_name())
     else:
-        type_field = field.type.value_type.typename
+        type_field = value_type.typename
     return type_field, link
 
 
-def read_constants(imported_interface, compact):
+def read_constants(imported_interface, compact, suffix=''):
     """
     Set constant in the compact structure.
 
@@ -259,16 +541,21 @@ def read_constants(imported_interface, compact):
     :param compact: dictionary with the compact definition
         (constanst and message with links)
     :type compact: dict
+    :param suffix: suffix of the keys of the compact definition, preceded by an underscore
+    :type suffix: str, optional
     :returns: dictionary with the compact definition (constanst and message with links)
     :rtype: dict
     """
+    key_suffix = '_' + suffix if suffix else ''
+    append_constant_name = compact['constant_names' + key_suffix].append
+    append_constant_type = compact['constant_types' + key_suffix].append
     constants = imported_interface.constants
     for constant in constants:
-        compact['constant_names'].append(constant.name + '=' + str(constant.value))
+        append_constant_name(constant.name + '=' + str(constant.value))
         if isinstance(constant.type, BasicType):
-            compact['constant_types'].append(constant.type.typename)
+            append_constant_type(constant.type.typename)
         elif isinstance(constant.type, AbstractGenericString):
-            compact['constant_types'].append('string')
+            append_constant_type('string')
     return compact
 
 
@@ -281,13 +568,151 @@ def read_default(field):
     :returns: dictionary with the compact definition (constanst and message with links)
     :rtype: dict
     """
-    if field.has_annotations('default'):
-        return '=' + str(field.get_annotation_values('default')[0]['value'])
+    # has_annotations would scan the annotations a second time
+    default_values = field.get_annotation_values('default')
+    if default_values:
+        return '=' + str(default_values[0]['value'])
     else:
         return ''
 
 
-def generate_compact_definition(imported_interface, indent):
+def _compact_basic_type(field):
+    """
+    Get the compact definition of a field of a basic type.
+
+    :param field: field of a BasicType
+    :type field: rosidl_parser.definition.Member
+    :returns: the type, the array definition and the link of the field
+    :rtype: str, str, str
+    """
+    return field.type.typename, '', ''
+
+
+def _compact_array(field):
+    """
+    Get the compact definition of an array field.
+
+    :param field: field of an Array type
+    :type field: rosidl_parser.definition.Member
+    :returns: the type, the array definition and the link of the field
+    :rtype: str, str, str
+    """
+    type_field, link = get_field_type_and_link(field)
+    if field.type.has_maximum_size():
+        return type_field, '[' + str(field.type.size) + ']', link
+    return type_field, '[]', link
+
+
+def _compact_string(field):
+    """
+    Get the compact definition of a string field, with its bound if any.
+
+    :param field: field of an AbstractGenericString type
+    :type field: rosidl_parser.definition.Member
+    :returns: the type, the array definition and the link of the field
+    :rtype: str, str, str
+    """
+    if isinstance(field.type, BoundedString):
+        return 'string[&lt;=' + str(field.type.maximum_size) + ']', '', ''
+    return 'string', '', ''
+
+
+def _compact_namespaced_type(field):
+    """
+    Get the compact definition of a field of another interface, with its link.
+
+    :param field: field of a NamespacedType
+    :type field: rosidl_parser.definition.Member
+    :returns: the type, the array definition and the link of the field
+    :rtype: str, str, str
+    """
+    type_field, link = get_namespaced_type_and_link(field.type.namespaced_name())
+    return type_field, '', link
+
+
+def _compact_unbounded_sequence(field):
+    """
+    Get the compact definition of an unbounded sequence field.
+
+    :param field: field of an UnboundedSequence type
+    :type field: rosidl_parser.definition.Member
+    :returns: the type, the array definition and the link of the field
+    :rtype: str, str, str
+    """
+    type_field, link = get_field_type_and_link(field)
+    return type_field, '[]', link
+
+
+def _compact_bounded_sequence(field):
+    """
+    Get the compact definition of a bounded sequence field.
+
+    :param field: field of a BoundedSequence type
+    :type field: rosidl_parser.definition.Member
+    :returns: the type, the array definition and the link of the field
+    :rtype: str, str, str
+    """
+    type_field, link = get_field_type_and_link(field)
+    return type_field, '[&lt;=' + str(field.type.maximum_size) + ']', link
+
+
+def _compact_nested_type(field):
+    """
+    Get the compact definition of a field of any other nested type.
+
+    :param field: field of a type matching none of the other handlers
+    :type field: rosidl_parser.definition.Member
+    :returns: the type, the array definition and the link of the field
+    :rtype: str, str, str
+    """
+    field_type = field.type
+    value_type = field_type.value_type
+    if isinstance(value_type, Array):
+        if value_type.has_maximum_size():
+            return '', '[]', ''
+        return '', '[' + value_type.maximum_size + ']', ''
+    if isinstance(value_type, AbstractString):
+        if isinstance(field_type, BoundedString):
+            return 'string[&lt;=' + str(field_type.maximum_size) + ']', '', ''
+        return 'string', '', ''
+    if isinstance(value_type, NamespacedType):
+        type_field, link = get_namespaced_type_and_link(value_type.namespaced_name())
+        return type_field, '', link
+    return str(value_type.typename), '', ''
+
+
+# Handlers returning the type, the array definition and the link of a field, in the order
+# the field type classes are matched; field types matching none are nested types
+_FIELD_TYPE_HANDLERS = (
+    (BasicType, _compact_basic_type),
+    (Array, _compact_array),
+    (AbstractGenericString, _compact_string),
+    (NamespacedType, _compact_namespaced_type),
+    (UnboundedSequence, _compact_unbounded_sequence),
+    (BoundedSequence, _compact_bounded_sequence),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def get_field_type_handler(field_type_class):
+    """
+    Get the handler computing the compact definition of a field type class.
+
+    The handler is resolved with issubclass once per class, so every later field of the same
+    class is dispatched with a single lookup instead of a chain of isinstance checks.
+
+    :param field_type_class: class of the field type
+    :type field_type_class: type
+    :returns: function returning the type, the array definition and the link of a field
+    :rtype: function
+    """
+    for base_class, handler in _FIELD_TYPE_HANDLERS:
+        if issubclass(field_type_class, base_class):
+            return handler
+    return _compact_nested_type
+
+
+def generate_compact_definition(imported_interface, indent, suffix='', compact=None):
     """
     Create the compact definition dictionary.
 
@@ -300,64 +725,42 @@ def generate_compact_definition(imported_interface, indent):
     :type imported_interface:
     :param indent: number of indentations to add to the generated text
     :type indent: int
+    :param suffix: suffix added to each key, preceded by an underscore, so the compact
+        definitions of several messages (e.g. a service request and response) can share a
+        dictionary
+    :type suffix: str, optional
+    :param compact: dictionary where the compact definition is added, a new one by default
+    :type compact: dict, optional
     :returns: dictionary with the compact definition (constanst and message with links)
     :rtype: dict
     """
-    compact = {
-        'constant_types': [],
-        'constant_names': [],
-        'relative_paths': [],
-        'field_types': [],
-        'field_names': [],
-        'field_default_values': []
-    }
-
-    compact = read_constants(imported_interface, compact)
+    if compact is None:
+        compact = {}
+
+    key_suffix = '_' + suffix if suffix else ''
+    compact['constant_types' + key_suffix] = []
+    compact['constant_names' + key_suffix] = []
+    relative_paths = compact['relative_paths' + key_suffix] = []
+    field_types = compact['field_types' + key_suffix] = []
+    field_names = compact['field_names' + key_suffix] = []
+    field_default_values = compact['field_default_values' + key_suffix] = []
+    # The append methods are bound once for the whole loop
+    append_relative_path = relative_paths.append
+    append_field_type = field_types.append
+    append_field_name = field_names.append
+    append_field_default_value = field_default_values.append
+
+    compact = read_constants(imported_interface, compact, suffix)
 
     for field in imported_interface.structure.members:
+        # Placeholder member added by rosidl to messages without fields
+        if field.name == 'structure_needs_at_least_one_member':
+            continue
 
-        compact['field_default_values'].append(read_default(field))
-
-        type_field = ''
-        array_definition_str = ''
-        link = ''
-        if isinstance(field.type, BasicType):
-            type_field = field.type.typename
-        elif isinstance(field.type, Array):
-            type_field, link = get_field_type_and_link(field)
-            if field.type.has_maximum_size():
-                array_definition_str = '[' + str(field.type.size) + ']'
-            else:
-                array_definition_str = '[]'
-        elif isinstance(field.type, AbstractGenericString):
-            type_field = 'string'
-            if isinstance(field.type, BoundedString):
-                type_field = 'string[&lt;=' + str(field.type.maximum_size) + ']'
-        elif isinstance(field.type, NamespacedType):
-            type_field = '/'.join(field.type.namespaced_name())
-            link = type_field + '.html'
-        elif isinstance(field.type, UnboundedSequence):
-            array_definition_str = '[]'
-            type_field, link = get_field_type_and_link(field)
-        elif isinstance(field.type, BoundedSequence):
-            array_definition_str = '[&lt;=' + str(field.type.maximum_size) + ']'
-            type_field, link = get_field_type_and_link(field)
-        elif isinstance(field.type.value_type, Array):
-            if field.type.value_type.has_maximum_size():
-                array_definition_str = '[]'
-            else:
-                array_definition_str = '[' + field.type.value_type.maximum_size + ']'
-        elif isinstance(field.type.value_type, AbstractString):
-            type_field = 'string'
-            if isinstance(field.type, BoundedString):
-                type_field = 'string[&lt;=' + str(field.type.maximum_size) + ']'
-        elif isinstance(field.type.value_type, NamespacedType):
-            type_field = '/'.join(field.type.value_type.namespaced_name())
-            link = type_field + '.html'
-        else:
-            type_field = str(field.type.value_type.typename)
-        if field.name != 'structure_needs_at_least_one_member':
-            compact['relative_paths'].append(link)
-            compact['field_types'].append(type_field + array_definition_str)
-            compact['field_names'].append(field.name)
+        append_field_default_value(read_default(field))
+
+        type_field, array_definition_str, link = get_field_type_handler(type(field.type))(field)
+        append_relative_path(link)
+        append_field_type(type_field + array_definition_str)
+        append_field_name(field.name)
     return compact
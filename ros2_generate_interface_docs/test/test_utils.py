@@ -0,0 +1,173 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import pytest
+
+from ros2_generate_interface_docs import utils
+
+
+@pytest.fixture
+def interface(tmp_path, monkeypatch):
+    interface_directory = tmp_path / 'share' / 'pkg' / 'msg'
+    interface_directory.mkdir(parents=True)
+    msg_path = interface_directory / 'Foo.msg'
+    msg_path.write_text('# A comment\nint32 data\n')
+    idl_path = interface_directory / 'Foo.idl'
+    idl_path.write_text('module pkg { module msg { struct Foo { int32 data; }; }; };\n')
+
+    monkeypatch.setattr(
+        utils, '_get_package_share_directory', lambda package: str(tmp_path / 'share' / package))
+    monkeypatch.setattr(utils, 'get_interface_path', lambda interface: str(msg_path))
+    # EmPy wraps sys.stdout, which pytest replaces between tests, so the pages are not
+    # rendered with the real templates
+    monkeypatch.setattr(
+        utils, 'evaluate_template',
+        lambda template_name, data: 'autogenerated on {timestamp}\n{raw_text}'.format(**data))
+
+    output_directory = tmp_path / 'html' / 'pkg' / 'msg'
+    output_directory.mkdir(parents=True)
+    return {
+        'sources': [str(msg_path), str(idl_path)],
+        'output': str(output_directory / 'Foo.html'),
+        'cache_dir': str(tmp_path / 'cache'),
+    }
+
+
+class TextFromSpec:
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, package, interface_name, indent=0):
+        self.calls += 1
+        return {
+            'constant_types': [],
+            'constant_names': [],
+            'relative_paths': [''],
+            'field_types': ['int32'],
+            'field_names': ['data'],
+            'field_default_values': [''],
+        }
+
+
+def generate(interface, generate_text_from_spec, timestamp, **kwargs):
+    documentation_data = {
+        'ext': 'msg',
+        'type': 'Message',
+        'interface_package': 'pkg',
+        'interface_name': 'msg/Foo',
+        'timestamp': timestamp,
+    }
+    utils.generate_interface_documentation(
+        'pkg/msg/Foo', 'msg.html.em', interface['output'], documentation_data,
+        generate_text_from_spec, **kwargs)
+    with open(interface['output'], 'r') as h:
+        return h.read()
+
+
+def set_mtime_ns(paths, mtime_ns):
+    for path in paths:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_is_documentation_up_to_date(interface):
+    output = interface['output']
+    sources = interface['sources']
+    assert not utils.is_documentation_up_to_date(output, 'msg.html.em', sources)
+
+    with open(output, 'w') as h:
+        h.write('documentation')
+    newest_input_mtime_ns = max(
+        utils.get_template_mtime_ns('msg.html.em'), utils.get_generator_mtime_ns())
+    set_mtime_ns(sources, newest_input_mtime_ns)
+    set_mtime_ns([output], newest_input_mtime_ns + 1)
+    assert utils.is_documentation_up_to_date(output, 'msg.html.em', sources)
+
+    # A newer interface source
+    set_mtime_ns(sources[1:], newest_input_mtime_ns + 2)
+    assert not utils.is_documentation_up_to_date(output, 'msg.html.em', sources)
+
+    # Newer generator code or template
+    set_mtime_ns(sources, 0)
+    set_mtime_ns([output], newest_input_mtime_ns - 1)
+    assert not utils.is_documentation_up_to_date(output, 'msg.html.em', sources)
+
+
+def test_generate_interface_documentation_up_to_date(interface):
+    generate_text_from_spec = TextFromSpec()
+    content = generate(interface, generate_text_from_spec, 'first')
+    assert generate_text_from_spec.calls == 1
+    assert 'autogenerated on first' in content
+    assert '<div class="comment-text"># A comment</div><br>' in content
+
+    assert generate(interface, generate_text_from_spec, 'second') == content
+    assert generate_text_from_spec.calls == 1
+
+    content = generate(interface, generate_text_from_spec, 'forced', force=True)
+    assert generate_text_from_spec.calls == 2
+    assert 'autogenerated on forced' in content
+
+
+def test_generate_interface_documentation_cache(interface):
+    cache_dir = interface['cache_dir']
+    os.makedirs(cache_dir)
+    generate_text_from_spec = TextFromSpec()
+
+    # Miss: the page is generated and stored in the cache
+    content = generate(interface, generate_text_from_spec, 'first', cache_dir=cache_dir)
+    assert generate_text_from_spec.calls == 1
+    cache_entries = os.listdir(cache_dir)
+    assert len(cache_entries) == 1
+    with open(os.path.join(cache_dir, cache_entries[0]), 'r') as h:
+        assert h.read() == content
+
+    # Hit: the cached page is reused even though the timestamp changed
+    os.remove(interface['output'])
+    assert generate(interface, generate_text_from_spec, 'second', cache_dir=cache_dir) == content
+    assert generate_text_from_spec.calls == 1
+
+    # Forced: the page is generated again and the cache entry is refreshed
+    content = generate(
+        interface, generate_text_from_spec, 'forced', cache_dir=cache_dir, force=True)
+    assert generate_text_from_spec.calls == 2
+    assert 'autogenerated on forced' in content
+    assert os.listdir(cache_dir) == cache_entries
+    with open(os.path.join(cache_dir, cache_entries[0]), 'r') as h:
+        assert h.read() == content
+
+    assert sorted(os.listdir(os.path.dirname(interface['output']))) == ['Foo.html']
+
+
+def test_replace_file(tmp_path):
+    output_file = str(tmp_path / 'page.html')
+    utils.write_template('first', output_file)
+    with open(output_file, 'r') as h:
+        assert h.read() == 'first'
+
+    def failing_writer(temporary_file):
+        with open(temporary_file, 'w') as h:
+            h.write('partial')
+        raise RuntimeError('interrupted')
+
+    with pytest.raises(RuntimeError):
+        utils.replace_file(output_file, failing_writer)
+    assert os.listdir(tmp_path) == ['page.html']
+    with open(output_file, 'r') as h:
+        assert h.read() == 'first'
+
+    with pytest.raises(UnicodeEncodeError):
+        utils.write_template('invalid \udcff', output_file)
+    assert os.listdir(tmp_path) == ['page.html']